@@ -49,8 +49,10 @@ for i in range(n_graphs):
     model.fit(train)
     preds = model.predict(test)
     print(f"Predictions ({titles[i]})\n{preds}\n")
-    cost_dict = model.cost_history
-    plt.plot(list(cost_dict.keys()), list(cost_dict.values()), linestyle="-", color=color[i])
+    # RidgeRegression stores the cost history in an array, LogisticRegression in a dictionary
+    costs = model.cost_history
+    costs = list(costs.values()) if isinstance(costs, dict) else costs
+    plt.plot(np.arange(len(costs)), costs, linestyle="-", color=color[i])
     plt.title(titles[i]), plt.xlabel("Iteration"), plt.ylabel("Cost")
     plt.show()
 
@@ -8,6 +8,11 @@ setup(
     packages=find_packages('src'),
     zip_safe=False,
     install_requires=['numpy', 'pandas', 'scipy'],
+    extras_require={
+        'numba': ['numba'],
+        'joblib': ['joblib'],
+        'all': ['numba', 'joblib'],
+    },
     author='',
     author_email='',
     description='Sistemas inteligentes',
@@ -149,6 +149,8 @@ class LogisticRegression:
         # initialize the model parameters (it can be initialized randomly using a range of values)
         self.theta = np.zeros(n)
         self.theta_zero = 0
+        # reset self.cost_history (otherwise, entries of a previous fit would be kept)
+        self.cost_history = {}
         # main loop -> gradient descent
         i = 0
         converged = False
@@ -178,6 +180,8 @@ class LogisticRegression:
         # initialize the model parameters (it can be initialized randomly using a range of values)
         self.theta = np.zeros(n)
         self.theta_zero = 0
+        # reset self.cost_history (otherwise, entries of a previous fit would be kept)
+        self.cost_history = {}
         # main loop -> gradient descent
         for i in range(self.max_iter):
             # compute gradient descent iteration (update model parameters)
@@ -1,267 +1,990 @@
-
-import numpy as np
-import sys
-PATHS = ["../data", "../metrics"]
-sys.path.extend(PATHS)
-from dataset import Dataset
-from r2_score import r2_score
-from typing import Union
-
-class RidgeRegression:
-
-    """
-    Implements Ridge Regression, a linear model using the L2 regularization. This model solves the
-    linear regression problem using an adapted Gradient Descent technique.
-    """
-
-    def __init__(self,
-                 l2_penalty: Union[int, float] = 1,
-                 alpha: Union[int, float] = 0.001,
-                 max_iter: int = 1000,
-                 tolerance: Union[int, float] = 1,
-                 adaptative_alpha: bool = False):
-        """
-        Implements Ridge Regression, a linear model using the L2 regularization. This model solves the
-        linear regression problem using an adapted Gradient Descent technique.
-
-        Parameters
-        ----------
-        l2_penalty: int, float (default=1)
-            The L2 regularization coefficient
-        alpha: int, float (default=0.001)
-            The learning rate
-        max_iter: int (default=1000)
-            The maximum number of iterations
-        tolerance: int, float (default=1)
-            Tolerance for stopping gradient descent (maximum absolute difference in the value of the
-            loss function between two iterations)
-        adaptative_alpha: bool (default=False)
-            Whether an adaptative alpha is used in the gradient descent
-
-        Attributes
-        ----------
-        fitted: bool
-            Whether the model is already fitted
-        theta: np.ndarray
-            Model parameters, namely the coefficients of the linear model
-        theta_zero: float
-            Model parameter, namely the intercept of the linear model
-        cost_history: dict
-            A dictionary containing the values of the cost function (J function) at each iteration
-            of the algorithm (gradient descent)
-        """
-        # check values of parameters
-        self._check_init(l2_penalty, alpha, max_iter, tolerance)
-        # parameters
-        self.l2_penalty = l2_penalty # lambda
-        self.alpha = alpha
-        self.max_iter = max_iter
-        self.tolerance = tolerance
-        self.adaptative_alpha = adaptative_alpha
-        # attributes
-        self.fitted = False
-        self.theta = None
-        self.theta_zero = None
-        self.cost_history = {}
-
-    @staticmethod
-    def _check_init(l2_penalty: Union[int, float],
-                    alpha: Union[int, float],
-                    max_iter: int,
-                    tolerance: Union[int, float]):
-        """
-        Checks the values of numeric parameters.
-
-        Parameters
-        ----------
-        l2_penalty: int, float
-            The L2 regularization coefficient
-        alpha: int, float
-            The learning rate
-        max_iter: int
-            The maximum number of iterations
-        tolerance: int, float
-            Tolerance for stopping gradient descent (maximum absolute difference in the value of the
-            loss function between two iterations)
-        """
-        if l2_penalty <= 0:
-            raise ValueError("The value of 'l2_penalty' must be positive.")
-        if alpha <= 0:
-            raise ValueError("The value of 'alpha' must be positive.")
-        if max_iter < 1:
-            raise ValueError("The value of 'max_iter' must be a positive integer.")
-        if tolerance <= 0:
-            raise ValueError("The value of 'tolerance' must be positive.")
-
-    def _gradient_descent_iter(self, dataset: Dataset, m: int) -> None:
-        """
-        Performs one iteration of the gradient descent algorithm. The algorithm goes as follows:
-        1. Predicts the outputs of the dataset
-            -> X @ theta + theta_zero
-        2. Computes the gradient vector and adjusts it according to the value of alpha
-            -> (alpha / m) * (y_pred - y_true) @ X
-        3. Computes the penalization term for theta
-            -> theta * alpha * (l2 / m)
-        4. Updates theta
-            -> theta = theta - gradient - penalization
-        5. Computes gradient for theta_zero
-            -> (alpha / m) * SUM[y_pred - y_true]
-        6. Updates theta_zero
-            -> theta_zero = theta_zero - gradient_zero
-
-        Parameters
-        ----------
-        dataset: Dataset
-            A Dataset object (the dataset used to fit the model)
-        m: int
-            The number of examples in the dataset
-        """
-        # predicted y
-        y_pred = np.dot(dataset.X, self.theta) + self.theta_zero
-        # compute the gradient vector (of theta) given a learning rate alpha
-        # vector of shape (n_features,) -> gradient[k] updates self.theta[k]
-        gradient = (self.alpha / m) * np.dot(y_pred - dataset.y, dataset.X)
-        # compute the penalization term
-        penalization_term = self.theta * self.alpha * (self.l2_penalty / m)
-        # update theta
-        self.theta = self.theta - gradient - penalization_term
-        # compute gradient for theta_zero (penalization term is 0)
-        gradient_zero = (self.alpha / m) * np.sum(y_pred - dataset.y)
-        # update theta_zero
-        self.theta_zero = self.theta_zero - gradient_zero
-
-    def _regular_fit(self, dataset: Dataset) -> "RidgeRegression":
-        """
-        Fits the model to the dataset. Does not update the learning rate (self.alpha). Covergence is attained 
-        whenever the difference of cost function values between iterations is less than <self.tolerance>.
-        Returns self (fitted model).
-
-        Parameters
-        ----------
-        dataset: Dataset
-            A Dataset object (the dataset used to fit the model)
-        """
-        # get the shape of the dataset
-        m, n = dataset.shape()
-        # initialize the model parameters (it can be initialized randomly using a range of values)
-        self.theta = np.zeros(n)
-        self.theta_zero = 0
-        # main loop -> gradient descent
-        i = 0
-        converged = False
-        while i < self.max_iter and not converged:
-            # compute gradient descent iteration (update model parameters)
-            self._gradient_descent_iter(dataset, m)
-            # add new entry to self.cost_history
-            self.cost_history[i] = self.cost(dataset)
-            # verify convergence
-            converged = abs(self.cost_history[i] - self.cost_history.get(i-1, np.inf)) < self.tolerance
-            i += 1
-        return self
-
-    def _adaptative_fit(self, dataset: Dataset) -> "RidgeRegression":
-        """
-        Fits the model to the dataset. Updates the learning rate (self.alpha) by halving it every
-        time the difference of cost function values between iterations is less than <self.tolerance>.
-        Returns self (fitted model).
-
-        Parameters
-        ----------
-        dataset: Dataset
-            A Dataset object (the dataset used to fit the model)
-        """
-        # get the shape of the dataset
-        m, n = dataset.shape()
-        # initialize the model parameters (it can be initialized randomly using a range of values)
-        self.theta = np.zeros(n)
-        self.theta_zero = 0
-        # main loop -> gradient descent
-        for i in range(self.max_iter):
-            # compute gradient descent iteration (update model parameters)
-            self._gradient_descent_iter(dataset, m)
-            # add new entry to self.cost_history
-            self.cost_history[i] = self.cost(dataset)
-            # update learning rate
-            is_lower = abs(self.cost_history[i] - self.cost_history.get(i-1, np.inf)) < self.tolerance
-            if is_lower: self.alpha /= 2
-        return self
-
-    def fit(self, dataset: Dataset) -> "RidgeRegression":
-        """
-        Fits the model to the dataset. If self.adaptative_alpha is True, fits the model by updating the
-        learning rate (alpha). Returns self (fitted model).
-
-        Parameters
-        ----------
-        dataset: Dataset
-            A Dataset object (the dataset to fit the model to)
-        """
-        self.fitted = True
-        return self._adaptative_fit(dataset) if self.adaptative_alpha else self._regular_fit(dataset)
-
-    def predict(self, dataset: Dataset) -> np.ndarray:
-        """
-        Predicts and returns the output of the dataset.
-
-        Parameters
-        ----------
-        dataset: Dataset
-            A Dataset object (the dataset to predict the output of)
-        """
-        if not self.fitted:
-            raise Warning("Fit 'RidgeRegression' before calling 'predict'.")
-        return np.dot(dataset.X, self.theta) + self.theta_zero
-
-    def score(self, dataset: Dataset) -> float:
-        """
-        Computes and returns the R2 score of the model on the dataset.
-
-        Parameters
-        ----------
-        dataset: Dataset
-            A Dataset object (the dataset to compute the R2 score on)
-        """
-        if not self.fitted:
-            raise Warning("Fit 'RidgeRegression' before calling 'score'.")
-        y_pred = self.predict(dataset)
-        return r2_score(dataset.y, y_pred)
-
-    def cost(self, dataset: Dataset) -> float:
-        """
-        Computes and returns the value of the cost function (J function) of the model on the dataset
-        using L2 regularization.
-
-        Parameters
-        ----------
-        dataset: Dataset
-            A Dataset object (the dataset to compute the cost function on)
-        """
-        if not self.fitted:
-            raise Warning("Fit 'RidgeRegression' before calling 'cost'.")
-        y_pred = self.predict(dataset)
-        sse = np.sum((y_pred - dataset.y) ** 2)
-        regularization = self.l2_penalty * np.sum(self.theta ** 2)
-        return (sse + regularization) / (2 * len(dataset.y))
-
-
-if __name__ == "__main__":
-
-    TEST_PATHS = ["../io", "../model_selection"]
-    sys.path.extend(TEST_PATHS)
-    from csv_file import read_csv_file
-    from sklearn.preprocessing import StandardScaler
-    from split import train_test_split
-
-    path_to_file = "../../../datasets/cpu/cpu.csv"
-    cpu = read_csv_file(file=path_to_file, sep=",", features=True, label=True)
-    cpu.X = StandardScaler().fit_transform(cpu.X)
-    cpu_trn, cpu_tst = train_test_split(cpu, test_size=0.3, random_state=2)
-    cpu_ridge = RidgeRegression(l2_penalty=1, alpha=0.001, max_iter=2000, tolerance=1, adaptative_alpha=True)
-    cpu_ridge = cpu_ridge.fit(cpu_trn)
-    #predictions = cpu_ridge.predict(cpu_tst)
-    #print(f"Predictions:\n{predictions}")
-    score_trn = cpu_ridge.score(cpu_trn)
-    score_tst = cpu_ridge.score(cpu_tst)
-    print(f"Train score (r2_score): {score_trn:.2%}")
-    print(f"Test score (r2_score): {score_tst:.2%}")
-
+
+import numpy as np
+import sys
+PATHS = ["../data", "../metrics", "../model_selection"]
+sys.path.extend(PATHS)
+from cross_validate import check_params, cross_validate, generate_splits
+from dataset import Dataset
+from r2_score import r2_score
+from scipy.linalg import cho_factor, cho_solve
+from typing import Callable, List, Tuple, Union
+
+# numba is an optional dependency (if missing, gradient descent falls back to plain numpy)
+try:
+    from numba import config, get_num_threads, njit, prange, set_num_threads
+    NUMBA_AVAILABLE = True
+except ImportError:
+    prange = range
+    NUMBA_AVAILABLE = False
+
+
+def _gd_step(Xa: np.ndarray,
+             y: np.ndarray,
+             w: np.ndarray,
+             alpha: float,
+             l2: float,
+             m: int) -> Tuple[np.ndarray, float]:
+    """
+    Performs one iteration of gradient descent in a single pass over Xa (prediction, residual,
+    gradient and parameter update are fused in explicit loops). Updates w in place and returns the
+    updated parameters (w) and the sum of squared errors of the parameters the iteration started
+    from. Compiled with numba whenever it is available.
+
+    Parameters
+    ----------
+    Xa: np.ndarray
+        The feature matrix of the dataset used to fit the model augmented with a leading column of ones
+    y: np.ndarray
+        The label vector of the dataset used to fit the model
+    w: np.ndarray
+        The parameters of the linear model ([theta_zero, theta])
+    alpha: float
+        The learning rate
+    l2: float
+        The L2 regularization coefficient
+    m: int
+        The number of examples in the dataset
+    """
+    n = Xa.shape[1]
+    grad = np.zeros(n)
+    sse = 0.0
+    for i in range(m):
+        # residual of the i-th example -> Xa[i] @ w - y[i]
+        err = -y[i]
+        for k in range(n):
+            err += Xa[i, k] * w[k]
+        sse += err * err
+        # accumulate the gradient of w
+        for k in range(n):
+            grad[k] += err * Xa[i, k]
+    # update w (gradient + penalization, except for theta_zero = w[0])
+    w[0] -= (alpha / m) * grad[0]
+    for k in range(1, n):
+        w[k] = w[k] * (1 - alpha * l2 / m) - (alpha / m) * grad[k]
+    return w, sse
+
+
+def _gd_steps(Xa: np.ndarray,
+              y: np.ndarray,
+              w: np.ndarray,
+              alpha: float,
+              l2: float,
+              m: int,
+              costs: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Performs len(costs) consecutive iterations of gradient descent (see _gd_step) without returning to
+    the interpreter in between. Stores the value of the cost function of the parameters each iteration
+    started from in costs (in place). Returns the updated parameters (w) and the sum of squared errors
+    computed in the last iteration. Compiled with numba whenever it is available.
+
+    Parameters
+    ----------
+    Xa: np.ndarray
+        The feature matrix of the dataset used to fit the model augmented with a leading column of ones
+    y: np.ndarray
+        The label vector of the dataset used to fit the model
+    w: np.ndarray
+        The parameters of the linear model ([theta_zero, theta])
+    alpha: float
+        The learning rate
+    l2: float
+        The L2 regularization coefficient
+    m: int
+        The number of examples in the dataset
+    costs: np.ndarray
+        The array where the values of the cost function are stored (one per iteration)
+    """
+    sse = 0.0
+    for j in range(costs.shape[0]):
+        # penalization term of the cost function (computed before updating w; theta_zero is excluded)
+        regularization = 0.0
+        for k in range(1, w.shape[0]):
+            regularization += w[k] * w[k]
+        w, sse = _gd_step(Xa, y, w, alpha, l2, m)
+        costs[j] = (sse + l2 * regularization) / (2 * m)
+    return w, sse
+
+
+def _gd_steps_gram(G: np.ndarray,
+                   Gy: np.ndarray,
+                   yty: float,
+                   w: np.ndarray,
+                   alpha: float,
+                   l2: float,
+                   m: int,
+                   costs: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Same as _gd_steps, but the gradient and the sum of squared errors are computed in Gram form (as in
+    RidgeRegression._gradient_descent_iter), so that the cost of each iteration does not depend on the
+    number of examples:
+        -> gradient = G @ w - Gy
+        -> SUM[residual^2] = w @ G @ w - 2 * w @ Gy + yty
+    Compiled with numba whenever it is available.
+
+    Parameters
+    ----------
+    G: np.ndarray
+        The Gram matrix Xa.T @ Xa (Xa is the feature matrix augmented with a leading column of ones)
+    Gy: np.ndarray
+        The vector Xa.T @ y
+    yty: float
+        The squared norm of the label vector (y @ y)
+    w: np.ndarray
+        The parameters of the linear model ([theta_zero, theta])
+    alpha: float
+        The learning rate
+    l2: float
+        The L2 regularization coefficient
+    m: int
+        The number of examples in the dataset
+    costs: np.ndarray
+        The array where the values of the cost function are stored (one per iteration)
+    """
+    n = G.shape[0]
+    grad = np.empty(n)
+    sse = 0.0
+    for j in range(costs.shape[0]):
+        # penalization term of the cost function (computed before updating w; theta_zero is excluded)
+        regularization = 0.0
+        for k in range(1, n):
+            regularization += w[k] * w[k]
+        # gradient and sum of squared errors of the current parameters
+        sse = yty
+        for k in range(n):
+            g = 0.0
+            for q in range(n):
+                g += G[k, q] * w[q]
+            sse += w[k] * g - 2 * w[k] * Gy[k]
+            grad[k] = g - Gy[k]
+        # update w (gradient + penalization, except for theta_zero = w[0])
+        w[0] -= (alpha / m) * grad[0]
+        for k in range(1, n):
+            w[k] = w[k] * (1 - alpha * l2 / m) - (alpha / m) * grad[k]
+        costs[j] = (sse + l2 * regularization) / (2 * m)
+    return w, sse
+
+
+def _gd_fit(Xa: np.ndarray,
+            y: np.ndarray,
+            alpha: float,
+            l2: float,
+            max_iter: int,
+            tolerance: float,
+            check_every: int) -> np.ndarray:
+    """
+    Fits a ridge regression model by gradient descent (same algorithm as RidgeRegression with
+    solver="gd" and adaptative_alpha=False) and returns the parameters w = [theta_zero, theta]. If
+    there are more examples than parameters, iterations are performed in Gram form (see
+    _gd_steps_gram). Compiled with numba whenever it is available.
+
+    Parameters
+    ----------
+    Xa: np.ndarray
+        The feature matrix of the dataset used to fit the model augmented with a leading column of ones
+    y: np.ndarray
+        The label vector of the dataset used to fit the model
+    alpha: float
+        The learning rate
+    l2: float
+        The L2 regularization coefficient
+    max_iter: int
+        The maximum number of iterations
+    tolerance: float
+        Tolerance for stopping gradient descent
+    check_every: int
+        The number of iterations between two checks of the stopping criterion
+    """
+    m, n = Xa.shape
+    w = np.zeros(n)
+    costs = np.empty(max_iter)
+    # Gram form (float64) -> computed once, each iteration then costs O(n^2) instead of O(m*n)
+    gram = m > n
+    G, Gy, yty = np.empty((0, 0)), np.empty(0), 0.0
+    if gram:
+        Xa64 = Xa.astype(np.float64)
+        y64 = y.astype(np.float64)
+        G = np.dot(Xa64.T, Xa64)
+        Gy = np.dot(y64, Xa64)
+        yty = np.dot(y64, y64)
+    i = 0
+    converged = False
+    while i < max_iter and not converged:
+        k = min(check_every, max_iter - i)
+        if gram:
+            w, sse = _gd_steps_gram(G, Gy, yty, w, alpha, l2, m, costs[i:i+k])
+        else:
+            w, sse = _gd_steps(Xa, y, w, alpha, l2, m, costs[i:i+k])
+        i += k
+        # cost of the current parameters (same stopping criterion as RidgeRegression._regular_fit)
+        regularization = 0.0
+        for q in range(1, n):
+            regularization += w[q] * w[q]
+        if gram:
+            sse = yty + np.dot(w, np.dot(G, w)) - 2 * np.dot(w, Gy)
+        else:
+            sse = 0.0
+            for r in range(m):
+                err = -y[r]
+                for q in range(n):
+                    err += Xa[r, q] * w[q]
+                sse += err * err
+        cost = (sse + l2 * regularization) / (2 * m)
+        prev_cost = costs[i-1] if i > 1 else np.inf
+        converged = abs(cost - prev_cost) < tolerance
+    return w
+
+
+def _r2(Xa: np.ndarray, y: np.ndarray, w: np.ndarray) -> float:
+    """
+    Computes and returns the R2 score of the linear model w = [theta_zero, theta] on (Xa, y) (see
+    r2_score). Compiled with numba whenever it is available.
+
+    Parameters
+    ----------
+    Xa: np.ndarray
+        The feature matrix augmented with a leading column of ones
+    y: np.ndarray
+        The label vector
+    w: np.ndarray
+        The parameters of the linear model ([theta_zero, theta])
+    """
+    m, n = Xa.shape
+    mu = 0.0
+    for i in range(m):
+        mu += y[i]
+    mu /= m
+    num = 0.0
+    denom = 0.0
+    for i in range(m):
+        err = -y[i]
+        for k in range(n):
+            err += Xa[i, k] * w[k]
+        num += err * err
+        denom += (y[i] - mu) * (y[i] - mu)
+    return 1 - (num / denom)
+
+
+def fit_score_folds(Xa: np.ndarray,
+                    y: np.ndarray,
+                    train_idx: np.ndarray,
+                    test_idx: np.ndarray,
+                    alpha: float,
+                    l2: float,
+                    max_iter: int,
+                    tolerance: float,
+                    check_every: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fits one ridge regression model (see _gd_fit) per cross-validation fold and computes its R2 score
+    on the training and on the testing data of the fold. Returns a tuple of arrays (train scores and
+    test scores). If numba is available, it is compiled with parallel=True and the folds are fitted
+    concurrently (one thread per fold, without the GIL).
+
+    Parameters
+    ----------
+    Xa: np.ndarray
+        The feature matrix of the dataset augmented with a leading column of ones
+    y: np.ndarray
+        The label vector of the dataset
+    train_idx: np.ndarray
+        Array of shape (n_folds, n_train) containing the indices of the training examples of each fold
+    test_idx: np.ndarray
+        Array of shape (n_folds, n_test) containing the indices of the testing examples of each fold
+    alpha: float
+        The learning rate
+    l2: float
+        The L2 regularization coefficient
+    max_iter: int
+        The maximum number of iterations
+    tolerance: float
+        Tolerance for stopping gradient descent
+    check_every: int
+        The number of iterations between two checks of the stopping criterion
+    """
+    n_folds = train_idx.shape[0]
+    train_scores = np.empty(n_folds)
+    test_scores = np.empty(n_folds)
+    for f in prange(n_folds):
+        Xa_train, y_train = Xa[train_idx[f]], y[train_idx[f]]
+        w = _gd_fit(Xa_train, y_train, alpha, l2, max_iter, tolerance, check_every)
+        train_scores[f] = _r2(Xa_train, y_train, w)
+        test_scores[f] = _r2(Xa[test_idx[f]], y[test_idx[f]], w)
+    return train_scores, test_scores
+
+if NUMBA_AVAILABLE:
+    _gd_step = njit(fastmath=True, cache=True)(_gd_step)
+    _gd_steps = njit(fastmath=True, cache=True)(_gd_steps)
+    _gd_steps_gram = njit(fastmath=True, cache=True)(_gd_steps_gram)
+    _gd_fit = njit(fastmath=True, cache=True)(_gd_fit)
+    _r2 = njit(fastmath=True, cache=True)(_r2)
+    fit_score_folds = njit(parallel=True, fastmath=True, cache=True)(fit_score_folds)
+
+# admissible values of 'solver' and 'l2_schedule'
+_SOLVERS = ("gd", "closed_form", "cg")
+_L2_SCHEDULES = (None, "residual", "exponential")
+
+
+class RidgeRegression:
+
+    """
+    Implements Ridge Regression, a linear model using the L2 regularization. This model solves the
+    linear regression problem using an adapted Gradient Descent technique or, optionally, in closed
+    form (solver="closed_form") or using the Conjugate Gradient method (solver="cg").
+    """
+
+    def __init__(self,
+                 l2_penalty: Union[int, float] = 1,
+                 alpha: Union[int, float] = 0.001,
+                 max_iter: int = 1000,
+                 tolerance: Union[int, float] = 1,
+                 adaptative_alpha: bool = False,
+                 solver: str = "gd",
+                 l2_schedule: str = None,
+                 beta: float = 1e-4,
+                 epsilon: float = 1e-4,
+                 dtype: type = np.float64,
+                 check_every: int = 1,
+                 cg_tolerance: float = 1e-8):
+        """
+        Implements Ridge Regression, a linear model using the L2 regularization. This model solves the
+        linear regression problem using an adapted Gradient Descent technique or, optionally, in closed
+        form (solver="closed_form") or using the Conjugate Gradient method (solver="cg").
+
+        Parameters
+        ----------
+        l2_penalty: int, float (default=1)
+            The L2 regularization coefficient
+        alpha: int, float (default=0.001)
+            The learning rate
+        max_iter: int (default=1000)
+            The maximum number of iterations
+        tolerance: int, float (default=1)
+            Tolerance for stopping gradient descent (maximum absolute difference in the value of the
+            loss function between two iterations)
+        adaptative_alpha: bool (default=False)
+            Whether an adaptative alpha is used in the gradient descent
+        solver: str (default="gd")
+            The method used to fit the model. Must be one of:
+                - "gd": gradient descent
+                - "closed_form": solves (Xa.T @ Xa + l2 * I') @ [theta_zero, theta] = Xa.T @ y in one
+                  step using a Cholesky factorization (Xa is X augmented with a column of ones and
+                  I' is the identity matrix without penalization for theta_zero). 'alpha', 'max_iter',
+                  'tolerance' and 'adaptative_alpha' are ignored
+                - "cg": solves the same system iteratively using the Conjugate Gradient method (converges
+                  in at most n_features + 1 iterations in exact arithmetic). Stops when the norm of the
+                  residual of the system relative to the norm of its right-hand side is less than
+                  'cg_tolerance'. 'alpha', 'tolerance' and 'adaptative_alpha' are ignored
+        l2_schedule: str (default=None)
+            How the L2 regularization coefficient is updated at each iteration of gradient descent (only
+            applicable when solver="gd"). Must be one of:
+                - None: 'l2_penalty' is kept fixed
+                - "residual": l2 = max(beta * ||r||^2, epsilon), where r is the residual (y_pred - y_true)
+                  of the current model (the penalty shrinks as the model fits the data)
+                - "exponential": l2 = l2_penalty * exp(log(epsilon / l2_penalty) * i / max_iter), i.e.,
+                  the penalty decays exponentially from 'l2_penalty' to 'epsilon'
+            In both cases, 'l2_penalty' itself is not modified (the scheduled value is only used by
+            gradient descent, and every call to 'fit' starts the schedule from 'l2_penalty')
+        beta: float (default=1e-4)
+            The scaling factor of the squared norm of the residual (l2_schedule="residual")
+        epsilon: float (default=1e-4)
+            The lower bound (l2_schedule="residual") or the final value (l2_schedule="exponential") of
+            the L2 regularization coefficient
+        dtype: type (default=np.float64)
+            The floating point type of the data and of theta in gradient descent and in 'predict'. Using
+            np.float32 halves the memory traffic (and doubles the SIMD width) at the cost of precision
+        check_every: int (default=1)
+            The number of iterations of gradient descent performed between two consecutive checks of the
+            stopping criterion (the adaptative alpha and the L2 schedule are also only updated between
+            checks). If numba is available, these iterations run without returning to the interpreter.
+            With the default (1), every iteration is checked; larger values trade a later stop (and
+            coarser alpha/L2 updates) for fewer trips to the interpreter
+        cg_tolerance: float (default=1e-8)
+            Tolerance for stopping the Conjugate Gradient method (solver="cg"). It is relative to the
+            norm of the right-hand side of the system (Xa.T @ y), so it does not depend on the scale of y
+
+        Attributes
+        ----------
+        fitted: bool
+            Whether the model is already fitted
+        theta: np.ndarray
+            Model parameters, namely the coefficients of the linear model
+        theta_zero: float
+            Model parameter, namely the intercept of the linear model
+        cost_history: np.ndarray
+            An array containing the values of the cost function (J function) after each iteration of
+            the algorithm (gradient descent). If solver="closed_form", it only has one entry. If
+            solver="cg", it contains the squared norm of the residual of the system at each iteration
+        """
+        # check values of parameters
+        self._check_init(l2_penalty, alpha, max_iter, tolerance, solver, l2_schedule, beta, epsilon, check_every,
+                         cg_tolerance)
+        # parameters
+        self.l2_penalty = l2_penalty # lambda
+        self.alpha = alpha
+        self.max_iter = max_iter
+        self.tolerance = tolerance
+        self.adaptative_alpha = adaptative_alpha
+        self.solver = solver
+        self.l2_schedule = l2_schedule
+        self.beta = beta
+        self.epsilon = epsilon
+        self.dtype = dtype
+        self.check_every = check_every
+        self.cg_tolerance = cg_tolerance
+        # attributes
+        self.fitted = False
+        self.theta = None
+        self.theta_zero = None
+        self.cost_history = None
+
+    @staticmethod
+    def _check_init(l2_penalty: Union[int, float],
+                    alpha: Union[int, float],
+                    max_iter: int,
+                    tolerance: Union[int, float],
+                    solver: str,
+                    l2_schedule: str,
+                    beta: float,
+                    epsilon: float,
+                    check_every: int,
+                    cg_tolerance: float):
+        """
+        Checks the values of the parameters.
+
+        Parameters
+        ----------
+        l2_penalty: int, float
+            The L2 regularization coefficient
+        alpha: int, float
+            The learning rate
+        max_iter: int
+            The maximum number of iterations
+        tolerance: int, float
+            Tolerance for stopping gradient descent (maximum absolute difference in the value of the
+            loss function between two iterations)
+        solver: str
+            The method used to fit the model
+        l2_schedule: str
+            How the L2 regularization coefficient is updated during gradient descent
+        beta: float
+            The scaling factor of the squared norm of the residual (l2_schedule="residual")
+        epsilon: float
+            The lower bound or the final value of the L2 regularization coefficient
+        check_every: int
+            The number of iterations of gradient descent between two checks of the stopping criterion
+        cg_tolerance: float
+            Tolerance for stopping the Conjugate Gradient method (relative to the norm of Xa.T @ y)
+        """
+        # fast path: a single combined comparison when all values are valid (the usual case)
+        if (min(l2_penalty, alpha, tolerance, beta, epsilon, cg_tolerance) > 0 and min(max_iter, check_every) >= 1
+                and solver in _SOLVERS and l2_schedule in _L2_SCHEDULES):
+            return
+        # otherwise, find the offending parameter
+        if l2_penalty <= 0:
+            raise ValueError("The value of 'l2_penalty' must be positive.")
+        if alpha <= 0:
+            raise ValueError("The value of 'alpha' must be positive.")
+        if max_iter < 1:
+            raise ValueError("The value of 'max_iter' must be a positive integer.")
+        if tolerance <= 0:
+            raise ValueError("The value of 'tolerance' must be positive.")
+        if solver not in _SOLVERS:
+            raise ValueError("The value of 'solver' must be one of {'gd', 'closed_form', 'cg'}.")
+        if l2_schedule not in _L2_SCHEDULES:
+            raise ValueError("The value of 'l2_schedule' must be one of {None, 'residual', 'exponential'}.")
+        if beta <= 0:
+            raise ValueError("The value of 'beta' must be positive.")
+        if epsilon <= 0:
+            raise ValueError("The value of 'epsilon' must be positive.")
+        if check_every < 1:
+            raise ValueError("The value of 'check_every' must be a positive integer.")
+        if cg_tolerance <= 0:
+            raise ValueError("The value of 'cg_tolerance' must be positive.")
+
+    @staticmethod
+    def _add_bias_column(X: np.ndarray, dtype: type = np.float64) -> np.ndarray:
+        """
+        Returns a C-contiguous copy of X (of type dtype) augmented with a leading column of ones, so that
+        the intercept of the model (theta_zero) becomes the first entry of the parameter vector.
+
+        Parameters
+        ----------
+        X: np.ndarray
+            The feature matrix
+        dtype: type (default=np.float64)
+            The type of the returned array
+        """
+        m, n = X.shape
+        Xa = np.empty((m, n+1), dtype=dtype)
+        Xa[:, 0] = 1
+        Xa[:, 1:] = X
+        return Xa
+
+    def _init_params(self, dataset: Dataset) -> None:
+        """
+        Initializes the model parameters, stored in a single vector w = [theta_zero, theta], and
+        precomputes the statistics used by the Gram form of gradient descent. The Gram matrix
+        (Xa.T @ Xa) is only precomputed if the dataset has more examples than features (m > n), since,
+        in that case, one gradient descent iteration becomes O(n^2) instead of O(m*n). Otherwise, the
+        statistics are set to None.
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset used to fit the model)
+        """
+        m, n = dataset.shape()
+        # initialize the model parameters (it can be initialized randomly using a range of values)
+        self._w = np.zeros(n+1, dtype=self.dtype)
+        # L2 regularization coefficient used by gradient descent (updated by the L2 schedule, if any,
+        # so that 'l2_penalty' is left untouched)
+        self._l2 = self.l2_penalty
+        # preallocate the values of the cost function -> self._costs[j] is the cost of the parameters
+        # obtained after j iterations (self.cost_history is self._costs[1:] trimmed after fitting)
+        self._costs = np.empty(self.max_iter + 1)
+        # C-contiguous copies of the data (of type self.dtype) used by gradient descent -> X is augmented
+        # with a column of ones (the intercept is handled by the same matrix-vector product); numba
+        # specializes _gd_step for homogeneous, stride-1 operands, which LLVM vectorizes using the
+        # SIMD/FMA instructions of the host CPU; a single (row-major) copy serves both Xa @ w and
+        # residual @ Xa, since BLAS computes the latter as a transposed gemv without copying Xa
+        self._Xa = self._add_bias_column(dataset.X, self.dtype)
+        self._y = np.ascontiguousarray(dataset.y, dtype=self.dtype)
+        # squared norm of the residual of the current model (w = 0 -> y @ y)
+        self._sse = float(np.dot(self._y, self._y))
+        # precompute Xa.T @ Xa, Xa.T @ y and y @ y (only once per fit) -> always in float64, since the sum
+        # of squared errors is recovered from them by subtraction
+        if m > n:
+            Xa, y = self._Xa.astype(np.float64, copy=False), self._y.astype(np.float64, copy=False)
+            self._G = np.dot(Xa.T, Xa)
+            self._Gy = np.dot(Xa.T, y)
+            self._yty = np.dot(y, y)
+        else:
+            self._G = self._Gy = self._yty = None
+        # buffers reused by every iteration of gradient descent (avoids allocating new arrays)
+        self._residual = np.empty(m, dtype=self.dtype)
+        self._gradient = np.empty(n+1, dtype=np.float64 if m > n else self.dtype)
+
+    def _update_l2_penalty(self, i: int) -> None:
+        """
+        Updates the L2 regularization coefficient used by gradient descent (self._l2) according to
+        self.l2_schedule, starting from self.l2_penalty (which is not modified). Does nothing if
+        self.l2_schedule is None. For l2_schedule="residual", it uses the squared norm of the residual
+        computed in the previous iteration of gradient descent.
+
+        Parameters
+        ----------
+        i: int
+            The current iteration of gradient descent
+        """
+        if self.l2_schedule == "residual":
+            self._l2 = max(self.beta * self._sse, self.epsilon)
+        elif self.l2_schedule == "exponential":
+            decay = np.log(self.epsilon / self.l2_penalty) * i / self.max_iter
+            self._l2 = self.l2_penalty * np.exp(decay)
+
+    def _gradient_descent_iter(self, dataset: Dataset, m: int) -> float:
+        """
+        Performs one iteration of the gradient descent algorithm. The model parameters are stored in
+        a single vector w = [theta_zero, theta] and X is augmented with a leading column of ones (Xa).
+        The algorithm goes as follows:
+        1. Computes the residual of the dataset
+            -> Xa @ w - y_true
+        2. Computes the value of the cost function (J function) from the residual
+            -> (SUM[residual^2] + l2 * SUM[theta^2]) / (2 * m)
+        3. Computes the gradient vector and adjusts it according to the value of alpha
+            -> (alpha / m) * residual @ Xa
+        4. Computes the penalization term for theta (theta_zero is not penalized)
+            -> theta * alpha * (l2 / m)
+        5. Updates w
+            -> w = w - gradient - penalization
+        Returns the value of the cost function computed in 2. (i.e., the cost of the parameters the
+        iteration started from), so that the cost does not need to be computed separately.
+        If the Gram matrix was precomputed (see _init_params), the gradient and the sum of squared
+        errors are computed in Gram form:
+            -> gradient = Xa.T @ Xa @ w - Xa.T @ y
+            -> SUM[residual^2] = w @ Xa.T @ Xa @ w - 2 * w @ Xa.T @ y + y @ y
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset used to fit the model)
+        m: int
+            The number of examples in the dataset
+        """
+        w = self._w
+        # penalization term of the cost function (computed before updating w)
+        regularization = self._l2 * float(np.dot(w[1:], w[1:]))
+        # Gram form -> does not depend on the number of examples
+        if self._G is not None:
+            gradient = np.dot(self._G, w, out=self._gradient)
+            sse = np.dot(w, gradient) - 2 * np.dot(w, self._Gy) + self._yty
+            gradient -= self._Gy
+        else:
+            # residual (computed once and reused) -> Xa @ w - y_true
+            residual = np.dot(self._Xa, w, out=self._residual)
+            residual -= self._y
+            sse = np.dot(residual, residual)
+            # vector of shape (n_features + 1,) -> gradient[k] updates w[k]
+            gradient = np.dot(residual, self._Xa, out=self._gradient)
+        # update w (penalization term first, then gradient)
+        w[1:] *= 1 - self.alpha * (self._l2 / m)
+        w -= (self.alpha / m) * gradient
+        self._sse = float(sse)
+        return (self._sse + regularization) / (2 * m)
+
+    def _gradient_descent_steps(self, dataset: Dataset, m: int, i: int, k: int) -> None:
+        """
+        Performs <k> iterations of the gradient descent algorithm, starting at iteration <i>, and stores
+        the values of the cost function in self._costs[i+1:i+k+1] (the cost of the parameters each
+        iteration started from is stored in the previous slot). If numba is installed, all <k> iterations
+        are fused into a single compiled call (_gd_steps_gram if the Gram matrix was precomputed - see
+        _init_params -, _gd_steps otherwise). Otherwise, calls _gradient_descent_iter <k> times.
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset used to fit the model)
+        m: int
+            The number of examples in the dataset
+        i: int
+            The first iteration to perform
+        k: int
+            The number of iterations to perform
+        """
+        costs = self._costs[i:i+k]
+        if self._G is not None and NUMBA_AVAILABLE:
+            self._w, self._sse = _gd_steps_gram(self._G, self._Gy, self._yty, self._w, self.alpha, self._l2,
+                                                m, costs)
+        elif NUMBA_AVAILABLE:
+            self._w, self._sse = _gd_steps(self._Xa, self._y, self._w, self.alpha, self._l2, m, costs)
+        else:
+            for j in range(k):
+                costs[j] = self._gradient_descent_iter(dataset, m)
+        # cost of the parameters obtained in the last iteration
+        self._costs[i+k] = self._current_cost(m)
+        # expose the parameters as theta and theta_zero
+        self.theta, self.theta_zero = self._w[1:], self._w[0]
+
+    def _regular_fit(self, dataset: Dataset) -> "RidgeRegression":
+        """
+        Fits the model to the dataset. Does not update the learning rate (self.alpha). Covergence is attained 
+        whenever the difference of cost function values between iterations is less than <self.tolerance>
+        (checked every <self.check_every> iterations). Returns self (fitted model).
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset used to fit the model)
+        """
+        # get the shape of the dataset and initialize the model parameters
+        m, n = dataset.shape()
+        self._init_params(dataset)
+        # main loop -> gradient descent
+        i = 0
+        converged = False
+        while i < self.max_iter and not converged:
+            k = min(self.check_every, self.max_iter - i)
+            # update the L2 regularization coefficient (if applicable)
+            self._update_l2_penalty(i)
+            # compute <k> gradient descent iterations (update model parameters) and add new entries to
+            # self._costs
+            self._gradient_descent_steps(dataset, m, i, k)
+            i += k
+            # verify convergence (costs of the parameters obtained in the last two iterations)
+            prev_cost = self._costs[i-1] if i > 1 else np.inf
+            converged = abs(self._costs[i] - prev_cost) < self.tolerance
+        self.cost_history = self._costs[1:i+1].copy()
+        self._release_buffers()
+        return self
+
+    def _current_cost(self, m: int) -> float:
+        """
+        Computes and returns the value of the cost function (J function) of the current parameters
+        (self._w) on the dataset used to fit the model (in Gram form, if the Gram matrix was
+        precomputed).
+
+        Parameters
+        ----------
+        m: int
+            The number of examples in the dataset
+        """
+        w = self._w
+        if self._G is not None:
+            sse = float(np.dot(w, np.dot(self._G, w)) - 2 * np.dot(w, self._Gy) + self._yty)
+        else:
+            residual = np.dot(self._Xa, w, out=self._residual)
+            residual -= self._y
+            sse = float(np.dot(residual, residual))
+        return (sse + self._l2 * float(np.dot(w[1:], w[1:]))) / (2 * m)
+
+    def _release_buffers(self) -> None:
+        """
+        Releases the copies of the data and the buffers allocated by _init_params, which are only needed
+        while fitting the model (otherwise, a fitted model would keep references to arrays of the size of
+        the dataset). Only self._w (and, therefore, theta and theta_zero) and self.cost_history are kept.
+        """
+        self._Xa = self._y = self._residual = self._gradient = None
+        self._G = self._Gy = self._yty = self._sse = None
+        self._costs = None
+
+    def _adaptative_fit(self, dataset: Dataset) -> "RidgeRegression":
+        """
+        Fits the model to the dataset. Updates the learning rate (self.alpha) by halving it every
+        time the difference of cost function values between iterations is less than <self.tolerance>
+        (checked every <self.check_every> iterations). Returns self (fitted model).
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset used to fit the model)
+        """
+        # get the shape of the dataset and initialize the model parameters
+        m, n = dataset.shape()
+        self._init_params(dataset)
+        # main loop -> gradient descent
+        for i in range(0, self.max_iter, self.check_every):
+            k = min(self.check_every, self.max_iter - i)
+            # update the L2 regularization coefficient (if applicable)
+            self._update_l2_penalty(i)
+            # compute <k> gradient descent iterations (update model parameters) and add new entries to
+            # self._costs
+            self._gradient_descent_steps(dataset, m, i, k)
+            # update learning rate (costs of the parameters obtained in the last two iterations)
+            prev_cost = self._costs[i+k-1] if i+k > 1 else np.inf
+            is_lower = abs(self._costs[i+k] - prev_cost) < self.tolerance
+            if is_lower: self.alpha /= 2
+        self.cost_history = self._costs[1:].copy()
+        self._release_buffers()
+        return self
+
+    def _normal_equations(self, dataset: Dataset) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Builds and returns the regularized normal equations of the model, A @ w = b, where w is the
+        vector [theta_zero, theta]. Uses X augmented with a leading column of ones (Xa):
+            -> A = Xa.T @ Xa + l2 * I' (I' is the identity matrix with I'[0, 0] = 0, so that theta_zero
+               is not penalized)
+            -> b = Xa.T @ y
+        A is symmetric positive definite (l2 > 0).
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset used to fit the model)
+        """
+        m, n = dataset.shape()
+        Xa = self._add_bias_column(dataset.X)
+        A = np.dot(Xa.T, Xa)
+        A[1:, 1:] += self.l2_penalty * np.eye(n)
+        b = np.dot(Xa.T, dataset.y)
+        return A, b
+
+    def _closed_form_fit(self, dataset: Dataset) -> "RidgeRegression":
+        """
+        Fits the model to the dataset by solving the regularized normal equations (see _normal_equations)
+        using a Cholesky factorization. Returns self (fitted model).
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset used to fit the model)
+        """
+        A, b = self._normal_equations(dataset)
+        coef = cho_solve(cho_factor(A), b)
+        self.theta_zero, self.theta = coef[0], coef[1:]
+        # only one entry in self.cost_history (no iterations)
+        self.cost_history = np.array([self.cost(dataset)])
+        return self
+
+    def _cg_fit(self, dataset: Dataset) -> "RidgeRegression":
+        """
+        Fits the model to the dataset by solving the regularized normal equations (see _normal_equations)
+        using the Conjugate Gradient method. Covergence is attained whenever the norm of the residual of
+        the system (b - A @ w) is less than <self.cg_tolerance> times the norm of b (a relative criterion,
+        so that it does not depend on the scale of the labels). Returns self (fitted model).
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset used to fit the model)
+        """
+        A, b = self._normal_equations(dataset)
+        # initialize the solution (w = [theta_zero, theta]), the residual and the search direction
+        w = np.zeros(b.shape[0])
+        r = b.astype(np.float64)
+        p = r.copy()
+        rs = np.dot(r, r)
+        # stopping threshold for the squared norm of the residual (||r|| < cg_tolerance * ||b||)
+        threshold = self.cg_tolerance ** 2 * rs
+        # main loop -> conjugate gradient
+        self.cost_history = np.empty(self.max_iter)
+        i = 0
+        while i < self.max_iter and rs > threshold:
+            Ap = np.dot(A, p)
+            step = rs / np.dot(p, Ap)
+            w += step * p
+            r -= step * Ap
+            rs_new = np.dot(r, r)
+            self.cost_history[i] = rs_new
+            # update the search direction (A-conjugate to the previous ones)
+            p = r + (rs_new / rs) * p
+            rs = rs_new
+            i += 1
+        self.cost_history = self.cost_history[:i]
+        self.theta_zero, self.theta = w[0], w[1:]
+        return self
+
+    def fit(self, dataset: Dataset) -> "RidgeRegression":
+        """
+        Fits the model to the dataset. If self.solver is "closed_form", solves the normal equations in
+        one step. If self.solver is "cg", solves them using the Conjugate Gradient method. Otherwise,
+        uses gradient descent: if self.adaptative_alpha is True, fits the model by updating the learning
+        rate (alpha). Returns self (fitted model).
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset to fit the model to)
+        """
+        self.fitted = True
+        if self.solver == "closed_form":
+            return self._closed_form_fit(dataset)
+        if self.solver == "cg":
+            return self._cg_fit(dataset)
+        return self._adaptative_fit(dataset) if self.adaptative_alpha else self._regular_fit(dataset)
+
+    def predict(self, dataset: Dataset) -> np.ndarray:
+        """
+        Predicts and returns the output of the dataset.
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset to predict the output of)
+        """
+        if not self.fitted:
+            raise Warning("Fit 'RidgeRegression' before calling 'predict'.")
+        return np.dot(dataset.X.astype(self.dtype, copy=False), self.theta) + self.theta_zero
+
+    def score(self, dataset: Dataset) -> float:
+        """
+        Computes and returns the R2 score of the model on the dataset.
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset to compute the R2 score on)
+        """
+        if not self.fitted:
+            raise Warning("Fit 'RidgeRegression' before calling 'score'.")
+        y_pred = self.predict(dataset)
+        return r2_score(dataset.y, y_pred)
+
+    def cost(self, dataset: Dataset) -> float:
+        """
+        Computes and returns the value of the cost function (J function) of the model on the dataset
+        using L2 regularization.
+
+        Parameters
+        ----------
+        dataset: Dataset
+            A Dataset object (the dataset to compute the cost function on)
+        """
+        if not self.fitted:
+            raise Warning("Fit 'RidgeRegression' before calling 'cost'.")
+        residual = self.predict(dataset) - dataset.y
+        sse = float(np.dot(residual, residual))
+        regularization = self.l2_penalty * float(np.dot(self.theta, self.theta))
+        return (sse + regularization) / (2 * len(dataset.y))
+
+
+# -- CROSS-VALIDATE
+
+def cross_validate_ridge(model: RidgeRegression,
+                         dataset: Dataset,
+                         cv: int = 5,
+                         random_state: int = None,
+                         test_size: float = 0.3,
+                         scoring: Callable = None,
+                         n_jobs: int = None,
+                         splits: List[Tuple[int, np.ndarray, np.ndarray]] = None) -> dict:
+    """
+    Implements the same k-fold cross-validation algorithm as cross_validate, specialized for a
+    RidgeRegression model. If numba is available, all folds are fitted by a single compiled function
+    (see fit_score_folds) using one thread per fold. Otherwise, or if the model does not use plain
+    gradient descent (solver="gd", adaptative_alpha=False and l2_schedule=None), or if 'scoring' is
+    not None, falls back to cross_validate. Returns the same dictionary as cross_validate.
+
+    Parameters
+    ----------
+    model: RidgeRegression
+        An initialized instance of RidgeRegression
+    dataset: Dataset
+        A Dataset object
+    cv: int (default=5)
+        The number of folds used in cross-validation
+    random_state: int (default=None)
+        Controls seed generation for splitting the data (allows for reproducible output)
+    test_size: float (default=0.3)
+        The proportion of the dataset to be used for testing
+    scoring: callable (default=None)
+        Scoring function used to evaluate the performance of the model (if None, uses the model's
+        scoring function, i.e., the R2 score)
+    n_jobs: int (default=None)
+        The number of threads (numba) or jobs (joblib, see cross_validate) used to fit the folds in
+        parallel. None means all threads for numba and 1 job for joblib, -1 means using all processors
+    splits: list (default=None)
+        Precomputed train-test splits (see generate_splits). If None, the splits are generated from
+        'cv', 'random_state' and 'test_size'
+    """
+    # check values of numeric parameters
+    check_params(dataset, cv, test_size)
+    # generate the train-test splits (if not provided)
+    if splits is None:
+        splits = generate_splits(dataset, cv, random_state, test_size)
+    # fall back to cross_validate if the compiled version is not applicable
+    plain_gd = model.solver == "gd" and not model.adaptative_alpha and model.l2_schedule is None
+    if not (NUMBA_AVAILABLE and plain_gd and scoring is None):
+        return cross_validate(model, dataset, cv, random_state, test_size, scoring, n_jobs, splits)
+    # all folds have the same size -> indices are stacked in arrays of shape (n_folds, n_train/n_test)
+    Xa = RidgeRegression._add_bias_column(dataset.X, model.dtype)
+    y = np.ascontiguousarray(dataset.y, dtype=model.dtype)
+    train_idx = np.array([train_idx for _, train_idx, _ in splits])
+    test_idx = np.array([test_idx for _, _, test_idx in splits])
+    # number of numba threads (same convention as joblib for negative values)
+    threads = get_num_threads()
+    if n_jobs is not None:
+        max_threads = config.NUMBA_NUM_THREADS
+        set_num_threads(max(1, min(max_threads, n_jobs if n_jobs > 0 else max_threads + 1 + n_jobs)))
+    try:
+        train_scores, test_scores = fit_score_folds(Xa, y, train_idx, test_idx, model.alpha,
+                                                    model.l2_penalty, model.max_iter, model.tolerance,
+                                                    model.check_every)
+    finally:
+        set_num_threads(threads)
+    seeds = [seed for seed, _, _ in splits]
+    return {"seeds": seeds, "train": train_scores.tolist(), "test": test_scores.tolist()}
+
+
+if __name__ == "__main__":
+
+    TEST_PATHS = ["../io", "../model_selection"]
+    sys.path.extend(TEST_PATHS)
+    from csv_file import read_csv_file
+    from sklearn.preprocessing import StandardScaler
+    from split import train_test_split
+
+    path_to_file = "../../../datasets/cpu/cpu.csv"
+    cpu = read_csv_file(file=path_to_file, sep=",", features=True, label=True)
+    cpu.X = StandardScaler().fit_transform(cpu.X)
+    cpu_trn, cpu_tst = train_test_split(cpu, test_size=0.3, random_state=2)
+    cpu_ridge = RidgeRegression(l2_penalty=1, alpha=0.001, max_iter=2000, tolerance=1, adaptative_alpha=True)
+    cpu_ridge = cpu_ridge.fit(cpu_trn)
+    #predictions = cpu_ridge.predict(cpu_tst)
+    #print(f"Predictions:\n{predictions}")
+    score_trn = cpu_ridge.score(cpu_trn)
+    score_tst = cpu_ridge.score(cpu_tst)
+    print(f"Train score (r2_score): {score_trn:.2%}")
+    print(f"Test score (r2_score): {score_tst:.2%}")
+
+    cv_scores = cross_validate_ridge(RidgeRegression(), cpu, cv=5, random_state=2)
+    print(f"Mean cross-validation test score (r2_score): {np.mean(cv_scores['test']):.2%}")
+
@@ -4,8 +4,15 @@ import sys
 sys.path.append("../data")
 from copy import deepcopy
 from dataset import Dataset
-from split import train_test_split
-from typing import Callable
+from split import split_from_indices, train_test_indices
+from typing import Callable, List, Tuple
+
+# joblib is an optional dependency (if missing, folds are always evaluated sequentially)
+try:
+    from joblib import Parallel, delayed
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
 
 
 # -- CHECK PARAMETERS
@@ -29,6 +36,72 @@ def check_params(dataset: Dataset, cv: int, test_size: float):
         raise ValueError("The value of 'test_size' must be in (0, 1).")
 
 
+# -- GENERATE SPLITS
+
+def generate_splits(dataset: Dataset,
+                    cv: int = 5,
+                    random_state: int = None,
+                    test_size: float = 0.3) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Generates the train-test splits used in cross-validation. Returns a list of <cv> tuples, each
+    containing the seed used in the split, the train indices and the test indices. The splits can be
+    computed once and reused for cross-validating several models on the same folds.
+
+    Parameters
+    ----------
+    dataset: Dataset
+        A Dataset object
+    cv: int (default=5)
+        The number of folds used in cross-validation
+    random_state: int (default=None)
+        Controls seed generation for splitting the data (allows for reproducible output)
+    test_size: float (default=0.3)
+        The proportion of the dataset to be used for testing
+    """
+    # generate all (distinct) seeds for train_test_indices at once
+    seeds = np.random.default_rng(random_state).choice(10**9, size=cv, replace=False).tolist()
+    return [(seed, *train_test_indices(dataset, test_size, seed)) for seed in seeds]
+
+
+# -- FIT AND SCORE (ONE FOLD)
+
+def _fit_and_score(model: "estimator",
+                   dataset: Dataset,
+                   train_idx: np.ndarray,
+                   test_idx: np.ndarray,
+                   scoring: Callable) -> Tuple[float, float]:
+    """
+    Fits a new instance of the model (deepcopy) on one train-test split of the dataset. Returns a tuple
+    containing the train score and the test score.
+
+    Parameters
+    ----------
+    model: estimator
+        An initialized instance of a classifier/regressor
+    dataset: Dataset
+        A Dataset object
+    train_idx: np.ndarray
+        The indices of the examples used for training
+    test_idx: np.ndarray
+        The indices of the examples used for testing
+    scoring: callable
+        The scoring function used to evaluate the performance of the model (if None, uses the
+        model's scoring function)
+    """
+    # initilize new instance of 'model' (deepcopy) for each fold (otherwise, the models would "inherit"
+    # the state of the previous fold)
+    Model = deepcopy(model)
+    # split data in train and test
+    ds_train, ds_test = split_from_indices(dataset, train_idx, test_idx)
+    # fit the model on training data
+    Model.fit(ds_train)
+    # if scoring is None, use the model's scoring function
+    if scoring is None:
+        return Model.score(ds_train), Model.score(ds_test)
+    # otherwise, use the provided scoring function
+    return scoring(ds_train.y, Model.predict(ds_train)), scoring(ds_test.y, Model.predict(ds_test))
+
+
 # -- CROSS-VALIDATE
 
 def cross_validate(model: "estimator",
@@ -36,7 +109,9 @@ def cross_validate(model: "estimator",
                    cv: int = 5,
                    random_state: int = None,
                    test_size: float = 0.3,
-                   scoring: Callable = None) -> dict:
+                   scoring: Callable = None,
+                   n_jobs: int = None,
+                   splits: List[Tuple[int, np.ndarray, np.ndarray]] = None) -> dict:
     """
     Implements a k-fold cross-validation algorithm. Each fold is established randomly. Returns a
     dictionary containing 3 keys:
@@ -59,36 +134,28 @@ def cross_validate(model: "estimator",
     scoring: callable (default=None)
         The scoring function used to evaluate the performance of the model (if None, uses the
         model's scoring function)
+    n_jobs: int (default=None)
+        The number of jobs used to evaluate the folds in parallel (requires joblib). None means 1 (the
+        folds are evaluated sequentially) and -1 means using all processors
+    splits: list (default=None)
+        Precomputed train-test splits (see generate_splits). If None, the splits are generated from
+        'cv', 'random_state' and 'test_size'
     """
     # check values of numeric parameters
     check_params(dataset, cv, test_size)
-    # main loop -> cross-validate model
-    scores = {"seeds": [], "train": [], "test": []}
-    for i in range(cv):
-        # initilize new instance of 'model' (deepcopy) at each iteration (otherwise, we only have a
-        # "fresh" model instance in the first iteration; in subsequent cv iterations, the models would
-        # "inherit" the state of the previous iteration)
-        Model = deepcopy(model)
-        # update random_state so that a distinct seed is generated next time (only if 'int')
-        random_state = random_state if random_state is None else random_state + i
-        # generate seed for train_test_split and add it to scores
-        seed = np.random.RandomState(seed=random_state).randint(0, 100000)
-        scores["seeds"] += [seed]
-        # split data in train and test
-        ds_train, ds_test = train_test_split(dataset=dataset, test_size=test_size, random_state=seed)
-        # fit the model on training data
-        Model.fit(ds_train)
-        # if scoring is None, use the model's scoring function
-        if scoring is None:
-            train_score = Model.score(ds_train)
-            test_score = Model.score(ds_test)
-        # otherwise, use the provided scoring function
-        else:
-            train_score = score(ds_train.y, Model.predict(ds_test))
-            test_score = score(ds_test.y, Model.predict(ds_test))
-        # add train_score and test_score to scores
-        scores["train"] += [train_score]
-        scores["test"] += [test_score]
+    # generate the train-test splits (if not provided)
+    if splits is None:
+        splits = generate_splits(dataset, cv, random_state, test_size)
+    # cross-validate model -> the folds are independent, hence they can be evaluated in parallel
+    if JOBLIB_AVAILABLE:
+        folds = Parallel(n_jobs=n_jobs)(delayed(_fit_and_score)(model, dataset, train_idx, test_idx, scoring)
+                                        for _, train_idx, test_idx in splits)
+    else:
+        folds = [_fit_and_score(model, dataset, train_idx, test_idx, scoring)
+                 for _, train_idx, test_idx in splits]
+    scores = {"seeds": [seed for seed, _, _ in splits],
+              "train": [train_score for train_score, _ in folds],
+              "test": [test_score for _, test_score in folds]}
     return scores
 
 
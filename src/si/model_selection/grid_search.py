@@ -4,10 +4,17 @@ import numpy as np
 import sys
 sys.path.append("../data")
 from copy import deepcopy
-from cross_validate import cross_validate
+from cross_validate import cross_validate, generate_splits
 from dataset import Dataset
 from typing import Callable
 
+# joblib is an optional dependency (if missing, combinations are always evaluated sequentially)
+try:
+    from joblib import Parallel, delayed
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
 
 # -- CHECK PARAMETERS
 
@@ -30,6 +37,50 @@ def check_params(dataset: Dataset, cv: int, test_size: float):
         raise ValueError("The value of 'test_size' must be in (0, 1).")
 
 
+# -- EVALUATE (ONE COMBINATION)
+
+def _evaluate_combination(model: "estimator",
+                          dataset: Dataset,
+                          parameters: dict,
+                          cv: int,
+                          random_state: int,
+                          test_size: float,
+                          scoring: Callable,
+                          splits: list) -> dict:
+    """
+    Cross-validates a new instance of the model (deepcopy) configured with one combination of
+    hyperparameters. Returns the cross-validation scores with an additional key ("parameters").
+
+    Parameters
+    ----------
+    model: estimator
+        An initialized instance of a classifier/regressor
+    dataset: Dataset
+        A Dataset object
+    parameters: dict
+        The combination of hyperparameters (names as keys and settings as values)
+    cv: int
+        The number of folds used in cross-validation
+    random_state: int
+        Controls seed generation for splitting the data
+    test_size: float
+        The proportion of the dataset to be used for testing
+    scoring: callable
+        The scoring function used to evaluate the performance of the model
+    splits: list
+        Precomputed train-test splits (if None, they are generated by cross_validate)
+    """
+    # initilize new instance of 'model' (deepcopy)
+    Model = deepcopy(model)
+    # set parameter configuration to cross-validate the model
+    for param, value in parameters.items():
+        setattr(Model, param, value)
+    # cross-validate the model and add the parameter configuration to score (new key)
+    score = cross_validate(Model, dataset, cv, random_state, test_size, scoring, splits=splits)
+    score["parameters"] = parameters
+    return score
+
+
 # -- GRID-SEARCH
 
 def grid_search_cv(model: "estimator",
@@ -38,7 +89,8 @@ def grid_search_cv(model: "estimator",
                    cv: int = 5,
                    random_state: int = None,
                    test_size: float = 0.3,
-                   scoring: Callable = None) -> list[dict]:
+                   scoring: Callable = None,
+                   n_jobs: int = None) -> list[dict]:
     """
     Implements an exhaustive grid-search algorithm with cross-validation for hyperparameter optimization.
     Returns a list of dictionaries, each representing one combination of hyperparameters. Each dictionary
@@ -51,7 +103,8 @@ def grid_search_cv(model: "estimator",
     Parameters
     ----------
     model: estimator
-        An initialized instance of a classifier/regressor
+        An initialized instance of a classifier/regressor (it is not modified, since each combination
+        of hyperparameters is set on a new instance of the model)
     dataset: Dataset
         A Dataset object
     parameter_grid: dict
@@ -68,6 +121,10 @@ def grid_search_cv(model: "estimator",
     scoring: callable (default=None)
         The scoring function used to evaluate the performance of the model (if None, uses the model's scoring
         function)
+    n_jobs: int (default=None)
+        The number of jobs used to evaluate the combinations of hyperparameters in parallel (requires
+        joblib). None means 1 (the combinations are evaluated sequentially) and -1 means using all
+        processors
     """
     # check values of numeric parameters
     check_params(dataset, cv, test_size)
@@ -76,24 +133,23 @@ def grid_search_cv(model: "estimator",
         if not hasattr(model, param):
             e_msg = f"The model {model.__class__.__name__} does not have the parameter '{param}'."
             raise AttributeError(e_msg)
-    # initialize 'scores' -> to return
-    scores = []
-    # for each combination of parameters
-    for comb in itertools.product(*parameter_grid.values()):
-        # initilize new instance of 'model' (deepcopy) at each iteration
-        Model = deepcopy(model)
-        # initialize 'parameters' -> add to scores
-        parameters = {}
-        # set parameter configuration (according to comb) to cross-validate the model
-        for param, value in zip(parameter_grid.keys(), comb):
-            setattr(Model, param, value)
-            parameters[param] = value
-        # cross-validate the model
-        score = cross_validate(Model, dataset, cv, random_state, test_size, scoring)
-        # add the parameter configuration to score (new key)
-        score["parameters"] = parameters
-        # add the cross-validation score to scores
-        scores += [score]
+    # all combinations of parameters (names as keys and settings as values)
+    combinations = [dict(zip(parameter_grid.keys(), comb))
+                    for comb in itertools.product(*parameter_grid.values())]
+    # if 'int', all combinations are cross-validated using the same train-test splits -> compute them
+    # only once
+    splits = None if random_state is None else generate_splits(dataset, cv, random_state, test_size)
+    # cross-validate the model for each combination -> combinations are independent, hence they can
+    # be evaluated in parallel
+    if JOBLIB_AVAILABLE:
+        scores = Parallel(n_jobs=n_jobs)(delayed(_evaluate_combination)(model, dataset, parameters, cv,
+                                                                        random_state, test_size, scoring,
+                                                                        splits)
+                                         for parameters in combinations)
+    else:
+        scores = [_evaluate_combination(model, dataset, parameters, cv, random_state, test_size, scoring,
+                                        splits)
+                  for parameters in combinations]
     return scores
 
 
@@ -1,23 +1,32 @@
 
+import inspect
 import numpy as np
 import sys
 sys.path.append("../data")
-from copy import deepcopy
-from cross_validate import cross_validate
+from copy import copy
+from cross_validate import cross_validate, generate_splits
 from dataset import Dataset
+from functools import lru_cache
 from typing import Callable
 
+# joblib is an optional dependency (if missing, iterations are always run sequentially)
+try:
+    from joblib import Parallel, delayed, effective_n_jobs
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
 
 # -- CHECK PARAMETERS
 
-def check_params(dataset: Dataset, cv: int, n_iter: int, test_size: float):
+def check_params(n: int, cv: int, n_iter: int, test_size: float):
     """
     Checks the values of numeric parameters.
 
     Parameters
     ----------
-    dataset: Dataset
-        A Dataset object
+    n: int
+        The number of examples in the dataset
     cv: int
         The number of folds used in cross-validation
     n_iter: int
@@ -25,7 +34,11 @@ def check_params(dataset: Dataset, cv: int, n_iter: int, test_size: float):
     test_size: float
         The proportion of the dataset to be used for testing
     """
-    if cv < 1 or cv > dataset.shape()[0]:
+    # fast path: a single chained comparison when all values are valid (the usual case)
+    if 1 <= cv <= n and n_iter >= 1 and 0 < test_size < 1:
+        return
+    # otherwise, find the offending parameter
+    if cv < 1 or cv > n:
         raise ValueError("The value of 'cv' must be an integer belonging to [1, dim_0(dataset)].")
     if n_iter < 1:
         raise ValueError("The value of 'n_iter' must be a positive integer.")
@@ -33,6 +46,94 @@ def check_params(dataset: Dataset, cv: int, n_iter: int, test_size: float):
         raise ValueError("The value of 'test_size' must be in (0, 1).")
 
 
+# -- CLONE
+
+@lru_cache(maxsize=None)
+def _init_params(cls: type) -> tuple:
+    """
+    Returns the names of the parameters of the constructor of cls (cached, so that the signature of
+    each class is only inspected once).
+
+    Parameters
+    ----------
+    cls: type
+        The class of an estimator
+    """
+    params = inspect.signature(cls.__init__).parameters.values()
+    return tuple(p.name for p in params if p.name != "self" and p.kind == p.POSITIONAL_OR_KEYWORD)
+
+
+def _clone(model: "estimator", **params) -> "estimator":
+    """
+    Returns a new (unfitted) instance of the model's class constructed with the current values of the
+    model's constructor parameters, updated with 'params' (parameters not accepted by the constructor
+    are set as attributes). Contrary to deepcopy, fitted attributes (coefficients, training data, etc.)
+    are not copied. Mutable parameter values are shallow-copied.
+
+    Parameters
+    ----------
+    model: estimator
+        An initialized instance of a classifier/regressor
+    **params
+        Constructor parameters to override (names as keys and settings as values)
+    """
+    kwargs = {}
+    for name in _init_params(model.__class__):
+        if name in params:
+            kwargs[name] = params[name]
+        elif hasattr(model, name):
+            value = getattr(model, name)
+            kwargs[name] = copy(value) if isinstance(value, (list, dict, set, np.ndarray)) else value
+    new_model = model.__class__(**kwargs)
+    # parameters which are not accepted by the constructor are set as attributes
+    for name, value in params.items():
+        if name not in kwargs:
+            setattr(new_model, name, value)
+    return new_model
+
+
+# -- RUN (ONE ITERATION)
+
+def _run_one(model: "estimator",
+             dataset: Dataset,
+             parameters: dict,
+             cv: int,
+             random_state: int,
+             test_size: float,
+             scoring: Callable,
+             splits: list) -> dict:
+    """
+    Runs one iteration of randomized search: sets one (sampled) combination of hyperparameters on a
+    new instance of the model (see _clone) and cross-validates it. Returns the cross-validation scores
+    with an additional key ("parameters").
+
+    Parameters
+    ----------
+    model: estimator
+        An initialized instance of a classifier/regressor
+    dataset: Dataset
+        A Dataset object
+    parameters: dict
+        The combination of hyperparameters (names as keys and settings as values)
+    cv: int
+        The number of folds used in cross-validation
+    random_state: int
+        Controls seed generation for splitting the data
+    test_size: float
+        The proportion of the dataset to be used for testing
+    scoring: callable
+        The scoring function used to evaluate the performance of the model
+    splits: list
+        Precomputed train-test splits (if None, they are generated by cross_validate)
+    """
+    # initilize new instance of 'model' with the parameter configuration
+    Model = _clone(model, **parameters)
+    # cross-validate the model and add the parameter configuration to score (new key)
+    score = cross_validate(Model, dataset, cv, random_state, test_size, scoring, splits=splits)
+    score["parameters"] = parameters
+    return score
+
+
 # -- RANDOMIZED-SEARCH
 
 def randomized_search_cv(model: "estimator",
@@ -42,7 +143,9 @@ def randomized_search_cv(model: "estimator",
                          random_state: int = None,
                          n_iter: int = 10,
                          test_size: float = 0.3,
-                         scoring: Callable = None) -> list[dict]:
+                         scoring: Callable = None,
+                         n_jobs: int = None,
+                         early_stopping: dict = None) -> list[dict]:
     """
     Implements a randomized search algorithm with cross-validation for hyperparameter optimization.
     Contrary to grid-search, it uses a fixed number of hyperparameter combinations randomly sampled
@@ -68,8 +171,8 @@ def randomized_search_cv(model: "estimator",
         Controls seed generation for splitting the data and rules hyperparameter choice over a
         distribution of hyperparameters (allows for reproducible output). If 'int', all combinations
         of hyperparameters are tested using the same train-test split when cross-validating the model.
-        In this case, distinct choices of hyperparameter combinations between iterations are ensured
-        by doing random_state := random_state + 1 every time the model is cross-validated
+        All <n_iter> combinations of hyperparameters are sampled upfront by a single generator seeded
+        with random_state
     n_iter: int (default=10)
         The number of random hyperparameter combinations to test
     test_size: float (default=0.3)
@@ -77,35 +180,71 @@ def randomized_search_cv(model: "estimator",
     scoring: callable (default=None)
         Scoring function used to evaluate the performance of the model (if None, uses the model's
         scoring function)
+    n_jobs: int (default=None)
+        The number of jobs used to run the iterations in parallel (requires joblib). None means 1 (the
+        iterations are run sequentially) and -1 means using all processors
+    early_stopping: dict (default=None)
+        If not None, the search stops as soon as 'n_iter_no_change' successive iterations fail to
+        improve the best mean score on testing data by more than max(tol_abs, tol_rel * |best|).
+        Accepted keys are 'n_iter_no_change' (default=5), 'tol_abs' (default=0) and 'tol_rel'
+        (default=0). It trades a (usually small) loss in the quality of the best combination for
+        fewer cross-validations, and is most effective when the scores plateau early. The returned
+        list does not depend on 'n_jobs' (in parallel, iterations are run in batches of n_jobs)
     """
     # check values of numeric parameters
-    check_params(dataset, cv, n_iter, test_size)
+    check_params(dataset.shape()[0], cv, n_iter, test_size)
+    # (name, distribution) pairs -> resolved once, instead of re-iterating the dictionary
+    param_list = list(parameter_distribution.items())
     # check if the model has all the parameters in parameter_distribution
-    for param in parameter_distribution:
+    for param, _ in param_list:
         if not hasattr(model, param):
             e_msg = f"The model {model.__class__.__name__} does not have the parameter '{param}'."
             raise AttributeError(e_msg)
-    # initialize scores -> to return
+    # check values of early-stopping parameters
+    if early_stopping is not None:
+        n_iter_no_change = early_stopping.get("n_iter_no_change", 5)
+        tol_abs = early_stopping.get("tol_abs", 0)
+        tol_rel = early_stopping.get("tol_rel", 0)
+        if n_iter_no_change < 1:
+            raise ValueError("The value of 'n_iter_no_change' must be a positive integer.")
+        if tol_abs < 0 or tol_rel < 0:
+            raise ValueError("The values of 'tol_abs' and 'tol_rel' must be non-negative.")
+    # sample all <n_iter> combinations of hyperparameters at once (one vectorized draw per parameter)
+    rng = np.random.default_rng(random_state)
+    names = [param for param, _ in param_list]
+    samples = [rng.choice(dist, size=n_iter) for _, dist in param_list]
+    combinations = [dict(zip(names, values)) for values in zip(*samples)]
+    if not param_list:
+        combinations = [{} for _ in range(n_iter)]
+    # if 'int', all combinations are cross-validated using the same train-test splits -> compute them
+    # only once
+    splits = None if random_state is None else generate_splits(dataset, cv, random_state, test_size)
+    # cross-validate the model <n_iter> times -> iterations are independent, hence they can be run in
+    # parallel
+    def run(combs):
+        if JOBLIB_AVAILABLE:
+            return Parallel(n_jobs=n_jobs)(delayed(_run_one)(model, dataset, parameters, cv, random_state,
+                                                             test_size, scoring, splits)
+                                           for parameters in combs)
+        return [_run_one(model, dataset, parameters, cv, random_state, test_size, scoring, splits)
+                for parameters in combs]
+    if early_stopping is None:
+        return run(combinations)
+    # early stopping -> run the iterations in batches (one iteration per job) and stop after
+    # <n_iter_no_change> successive iterations without improvement
+    batch_size = effective_n_jobs(n_jobs) if JOBLIB_AVAILABLE else 1
     scores = []
-    # cross-validate the model <n_iter> times
-    for i in range(n_iter):
-        # initilize new instance of 'model' (deepcopy) at each iteration
-        Model = deepcopy(model)
-        # initialize 'parameters' -> add to scores
-        parameters = {}
-        # initialize seed for choosing hyperparameters (if 'int', random_state += 1)
-        seed_hyper = random_state if random_state is None else random_state + i
-        # set parameter configuration to cross-validate the model, and add it to parameters
-        for param in parameter_distribution:
-            value = np.random.RandomState(seed=seed_hyper).choice(parameter_distribution[param])
-            setattr(Model, param, value)
-            parameters[param] = value
-        # cross-validate the model
-        score = cross_validate(Model, dataset, cv, random_state, test_size, scoring)
-        # add the parameter configuration to score (new key)
-        score["parameters"] = parameters
-        # add the score to scores
-        scores += [score]
+    best, no_improve = None, 0
+    for start in range(0, n_iter, batch_size):
+        for score in run(combinations[start:start + batch_size]):
+            scores.append(score)
+            cur = np.mean(score["test"])
+            if best is not None and cur - best <= max(tol_abs, tol_rel * abs(best)):
+                no_improve += 1
+                if no_improve >= n_iter_no_change:
+                    return scores
+            else:
+                best, no_improve = cur, 0
     return scores
 
 
@@ -138,6 +277,7 @@ if __name__ == "__main__":
                               cv=3,
                               random_state=2,
                               n_iter=10,
-                              test_size=0.3)
+                              test_size=0.3,
+                              n_jobs=-1)
     print_scores(gs)
 
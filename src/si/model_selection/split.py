@@ -5,15 +5,17 @@ sys.path.append("../data")
 from dataset import Dataset
 from typing import Tuple
 
-def train_test_split(dataset: Dataset, test_size: float = 0.3, random_state: int = None) -> Tuple[Dataset, Dataset]:
+def train_test_indices(dataset: Dataset,
+                       test_size: float = 0.3,
+                       random_state: int = None) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Randomly divides a given dataset into train and test subsets. Returns new Dataset objects (a training
-    set and a testing set).
+    Randomly divides the indices of the examples of a given dataset into train and test indices. Returns
+    a tuple of arrays (train indices and test indices).
 
     Parameters
     ----------
     dataset: Dataset
-        The Dataset object to be divided into train and test
+        The Dataset object whose examples are to be divided into train and test
     test_size: float (default=0.3)
         The proportion of the dataset to be used for testing
     random_state: int (default=None)
@@ -24,14 +26,45 @@ def train_test_split(dataset: Dataset, test_size: float = 0.3, random_state: int
     perms = np.random.RandomState(seed=random_state).permutation(n)
     # determine the indices of the training and testing data
     n_test = int(test_size * n)
-    train_idx = perms[n_test:]
-    test_idx = perms[:n_test]
-    # generate new datasets (one for training, another for testing)
+    return perms[n_test:], perms[:n_test]
+
+
+def split_from_indices(dataset: Dataset, train_idx: np.ndarray, test_idx: np.ndarray) -> Tuple[Dataset, Dataset]:
+    """
+    Divides a given dataset into train and test subsets according to the indices it takes as input.
+    Returns new Dataset objects (a training set and a testing set).
+
+    Parameters
+    ----------
+    dataset: Dataset
+        The Dataset object to be divided into train and test
+    train_idx: np.ndarray
+        The indices of the examples used for training
+    test_idx: np.ndarray
+        The indices of the examples used for testing
+    """
     train = Dataset(dataset.X[train_idx], dataset.y[train_idx], dataset.features, dataset.label)
     test = Dataset(dataset.X[test_idx], dataset.y[test_idx], dataset.features, dataset.label)
     return train, test
 
 
+def train_test_split(dataset: Dataset, test_size: float = 0.3, random_state: int = None) -> Tuple[Dataset, Dataset]:
+    """
+    Randomly divides a given dataset into train and test subsets. Returns new Dataset objects (a training
+    set and a testing set).
+
+    Parameters
+    ----------
+    dataset: Dataset
+        The Dataset object to be divided into train and test
+    test_size: float (default=0.3)
+        The proportion of the dataset to be used for testing
+    random_state: int (default=None)
+        Seed for the permutation generator used in the split
+    """
+    train_idx, test_idx = train_test_indices(dataset, test_size, random_state)
+    return split_from_indices(dataset, train_idx, test_idx)
+
 if __name__ == "__main__":
     
     ds = Dataset.from_random(n_examples=10, n_features=10, label=True, seed=2)
@@ -5,9 +5,127 @@ PATHS = ["../data", "../metrics", "../statistics"]
 sys.path.extend(PATHS)
 from accuracy import accuracy
 from dataset import Dataset
-from distances import euclidean_distance
+from distances import euclidean_distance, manhattan_distance
+from scipy.spatial import cKDTree
 from typing import Callable, Union
 
+# numba is an optional dependency (if missing, predictions fall back to plain numpy)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    prange = range
+    NUMBA_AVAILABLE = False
+
+
+def _squared_euclidean(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Computes the squared Euclidean distance between two vectors: SUM[(ai - bi)^2].
+
+    Parameters
+    ----------
+    a: np.ndarray
+        A vector
+    b: np.ndarray
+        A vector
+    """
+    dist = 0.0
+    for j in range(a.shape[0]):
+        diff = a[j] - b[j]
+        dist += diff * diff
+    return dist
+
+
+def _manhattan(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Computes the Manhattan distance between two vectors: SUM[abs(ai - bi)].
+
+    Parameters
+    ----------
+    a: np.ndarray
+        A vector
+    b: np.ndarray
+        A vector
+    """
+    dist = 0.0
+    for j in range(a.shape[0]):
+        dist += abs(a[j] - b[j])
+    return dist
+
+
+def _knn_predict_numba(X_test: np.ndarray,
+                       X_train: np.ndarray,
+                       y_encoded: np.ndarray,
+                       n_classes: int,
+                       k: int,
+                       weights: np.ndarray,
+                       manhattan: bool) -> np.ndarray:
+    """
+    Returns the predicted (encoded) labels of the examples in X_test. For each test example, the
+    <k> nearest training examples are kept in a sorted array updated by insertion in a
+    single pass over the training data (no distance matrix, no full sort). If numba is available, it
+    is compiled with parallel=True (test examples are processed concurrently).
+
+    Parameters
+    ----------
+    X_test: np.ndarray
+        The examples to be assigned to a label
+    X_train: np.ndarray
+        The training examples
+    y_encoded: np.ndarray
+        The labels of the training examples encoded as integers in [0, n_classes)
+    n_classes: int
+        The number of classes
+    k: int
+        The number of neighbors to be used (at most the number of training examples)
+    weights: np.ndarray
+        The weight of the vote of each closest neighbor (from the closest to the farthest), of
+        length k
+    manhattan: bool
+        Whether to use the Manhattan distance (otherwise, the squared Euclidean distance is used)
+    """
+    y_pred = np.empty(X_test.shape[0], dtype=np.int64)
+    for i in prange(X_test.shape[0]):
+        knn_dist = np.full(k, np.inf)
+        knn_idx = np.zeros(k, dtype=np.int64)
+        for j in range(X_train.shape[0]):
+            if manhattan:
+                dist = _manhattan(X_test[i], X_train[j])
+            else:
+                dist = _squared_euclidean(X_test[i], X_train[j])
+            # insert the example in the sorted array of the <k> nearest examples (if applicable)
+            if dist < knn_dist[k-1]:
+                pos = k - 1
+                while pos > 0 and knn_dist[pos-1] > dist:
+                    knn_dist[pos] = knn_dist[pos-1]
+                    knn_idx[pos] = knn_idx[pos-1]
+                    pos -= 1
+                knn_dist[pos] = dist
+                knn_idx[pos] = j
+        # (weighted) votes of the neighbors -> the most voted class wins (ties: the smallest class)
+        votes = np.zeros(n_classes)
+        for r in range(k):
+            votes[y_encoded[knn_idx[r]]] += weights[r]
+        y_pred[i] = np.argmax(votes)
+    return y_pred
+
+if NUMBA_AVAILABLE:
+    _squared_euclidean = njit(fastmath=True, cache=True)(_squared_euclidean)
+    _manhattan = njit(fastmath=True, cache=True)(_manhattan)
+    _knn_predict_numba = njit(parallel=True, fastmath=True, cache=True)(_knn_predict_numba)
+
+# a k-d tree is built in 'fit' for training sets with more than _KDTREE_MIN_TRAIN examples and at most
+# _KDTREE_MAX_FEATURES features (euclidean and manhattan distances) -> in higher dimensions, k-d tree
+# queries visit most leaves and become slower than the brute-force scan
+_KDTREE_MIN_TRAIN = 2000
+_KDTREE_MAX_FEATURES = 8
+
+# the compiled kernel (_knn_predict_numba) is used for the manhattan distance and, for the euclidean
+# distance, for at most _NUMBA_MAX_FEATURES features -> with more features, the matrix product (BLAS)
+# used by the blocked path computes the euclidean distances faster than the compiled scan
+_NUMBA_MAX_FEATURES = 32
+
+
 class KNNClassifier:
 
     """
@@ -17,7 +135,12 @@ class KNNClassifier:
         - manhattan_distance: SUM[abs(pi - qi)]
     """
 
-    def __init__(self, k: int = 4, weighted: bool = False, distance: Callable = euclidean_distance):
+    def __init__(self,
+                 k: int = 4,
+                 weighted: bool = False,
+                 distance: Callable = euclidean_distance,
+                 block_size: int = 256,
+                 dtype: type = np.float64):
         """
         Implements the K-Nearest Neighbors classifier. Distances between test examples and examples
         present in the training data can be computed using one of two distinct formulas:
@@ -32,27 +155,34 @@ class KNNClassifier:
             Whether to weigh closest neighbors when predicting labels
         distance: callable (default=euclidean_distance)
             Function used to compute the distances
+        block_size: int (default=256)
+            Number of test examples whose distances to the training examples are computed at once
+            (only applicable to euclidean_distance and manhattan_distance, when neither the k-d tree
+            nor the compiled kernel is used - see '_predict_vectorized')
+        dtype: type (default=np.float64)
+            The floating point type of the training and testing examples when computing euclidean and
+            manhattan distances (np.float32 halves memory traffic and doubles SIMD throughput, at the
+            cost of precision in near-ties)
 
         Attributes
         ----------
         fitted: bool
             Whether the model is already fitted
-        weights_vector: np.ndarray
-            The weights to give to each closest neighbor when predicting labels (only applicable
-            when 'weights' is True)
         dataset: Dataset
             A Dataset object (training data)
         """
         # parameters
         if k < 1:
             raise ValueError("The value of 'k' must be greater than 0.")
+        if block_size < 1:
+            raise ValueError("The value of 'block_size' must be greater than 0.")
         self.k = k
         self.weighted = weighted
         self.distance = distance
+        self.block_size = block_size
+        self.dtype = dtype
         # attributes
         self.fitted = False
-        if self.weighted:
-            self.weights_vector = np.arange(self.k,0,-1)
         self.dataset = None
 
     def fit(self, dataset: Dataset) -> "KNNClassifier":
@@ -65,9 +195,34 @@ class KNNClassifier:
             A Dataset object (training data)
         """
         self.dataset = dataset
+        # encode labels as integers (indexes of the sorted classes) -> votes are counted with bincount
+        self._classes, self._y_idx = np.unique(dataset.y, return_inverse=True)
+        # contiguous copy of the training examples (of type self.dtype) and (euclidean only) their
+        # squared norms, computed once instead of at every call to 'predict'
+        self._is_euclidean = self.distance is euclidean_distance
+        self._X = np.ascontiguousarray(dataset.X, dtype=self.dtype)
+        self._train_sq = np.einsum("ij,ij->i", self._X, self._X) if self._is_euclidean else None
+        # k-d tree (large training sets only) -> O(log(n)) queries instead of a scan of the training set
+        tree_distance = self._is_euclidean or self.distance is manhattan_distance
+        n_train, n_features = self._X.shape
+        use_tree = tree_distance and n_train > _KDTREE_MIN_TRAIN and n_features <= _KDTREE_MAX_FEATURES
+        self._tree = cKDTree(self._X, leafsize=32) if use_tree else None
         self.fitted = True
         return self
 
+    def _rank_weights(self, k: int) -> np.ndarray:
+        """
+        Returns the weights of the votes of the <k> closest neighbors (from the closest to the
+        farthest): self.k, self.k - 1, ... Built from the current value of 'k' at every call, so that
+        changing 'k' after initialization (e.g., in grid-search) is taken into account.
+
+        Parameters
+        ----------
+        k: int
+            The number of closest neighbors (at most self.k)
+        """
+        return np.arange(self.k, self.k - k, -1, dtype=np.float64)
+
     def _get_closest_label(self, sample: np.ndarray) -> Union[int, str]:
         """
         Returns the predicted label of the sample given as input. The label is determined by
@@ -80,16 +235,127 @@ class KNNClassifier:
         """
         # compute the distances between a sample and each example in the training dataset
         distances = self.distance(sample, self.dataset.X)
-        # determine the indexes of the <k> nearest examples
-        k_nearest_neighbors = np.argsort(distances)[:self.k]
-        # get the classes corresponding to the previous indexes
-        knn_labels = self.dataset.y[k_nearest_neighbors]
-        # transform labels vector to account for weights (if applicable)
+        # determine the indexes of the <k> nearest examples (partial sort -> O(n) instead of O(n*log(n)))
+        k = min(self.k, distances.shape[0])
+        k_nearest_neighbors = np.argpartition(distances, k-1)[:k]
+        # order the <k> nearest examples by distance (weights depend on the rank of the neighbor)
+        if self.weighted:
+            k_nearest_neighbors = k_nearest_neighbors[np.argsort(distances[k_nearest_neighbors])]
+        # get the (encoded) classes corresponding to the previous indexes
+        knn_labels = self._y_idx[k_nearest_neighbors]
+        # get the most frequent class in the selected <k> examples (weighted, if applicable)
+        weights = self._rank_weights(k) if self.weighted else None
+        counts = np.bincount(knn_labels, weights=weights, minlength=self._classes.size)
+        return self._classes[np.argmax(counts)]
+
+    def _distance_matrix(self, X: np.ndarray) -> np.ndarray:
+        """
+        Computes the distances between each sample in X and each example in the training dataset at
+        once. Returns an array of shape (n_samples, n_train). For euclidean_distance, squared distances
+        are returned (the square root is monotonic, hence it does not change the nearest neighbors).
+
+        Parameters
+        ----------
+        X: np.ndarray
+            The samples to be assigned to a label
+        """
+        X_train = self._X
+        if self._is_euclidean:
+            # (a-b)^2 = a^2 - 2ab + b^2 -> a single matrix product (BLAS)
+            X_sq = np.einsum("ij,ij->i", X, X)
+            return X_sq[:, None] + self._train_sq[None, :] - 2 * np.dot(X, X_train.T)
+        # accumulate feature by feature -> no (n_samples, n_train, n_features) intermediate array
+        distances = np.zeros((X.shape[0], X_train.shape[0]), dtype=X_train.dtype)
+        for j in range(X.shape[1]):
+            distances += np.absolute(X[:, j, None] - X_train[None, :, j])
+        return distances
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the predicted labels of the samples in X (same algorithm as _get_closest_label, but
+        computed for all samples at once).
+
+        Parameters
+        ----------
+        X: np.ndarray
+            The samples to be assigned to a label
+        """
+        distances = self._distance_matrix(X)
+        k = min(self.k, distances.shape[1])
+        # determine the indexes of the <k> nearest examples of each sample (partial sort)
+        k_nearest_neighbors = np.argpartition(distances, k-1, axis=1)[:, :k]
+        # order the <k> nearest examples by distance (weights depend on the rank of the neighbor)
         if self.weighted:
-            knn_labels = np.repeat(knn_labels, self.weights_vector)
-        # get the most frequent class in the selected <k> examples
-        labels, counts = np.unique(knn_labels, return_counts=True)
-        return labels[np.argmax(counts)]
+            knn_distances = np.take_along_axis(distances, k_nearest_neighbors, axis=1)
+            order = np.argsort(knn_distances, axis=1)
+            k_nearest_neighbors = np.take_along_axis(k_nearest_neighbors, order, axis=1)
+        return self._vote(k_nearest_neighbors)
+
+    def _vote(self, k_nearest_neighbors: np.ndarray) -> np.ndarray:
+        """
+        Returns the labels determined by (weighted) majority vote over the labels of the closest
+        neighbors of each sample.
+
+        Parameters
+        ----------
+        k_nearest_neighbors: np.ndarray
+            Array of shape (n_samples, k) containing the indexes of the closest neighbors of each sample
+            (ordered by distance if 'weighted' is True)
+        """
+        n, k = k_nearest_neighbors.shape
+        # get the (encoded) classes of the neighbors
+        knn_labels = self._y_idx[k_nearest_neighbors]
+        # (weighted) votes of the neighbors -> a single bincount over (sample, class) pairs, with the
+        # class indexes of sample i offset by i*n_classes
+        n_classes = self._classes.size
+        offsets = (knn_labels + np.arange(n)[:, None] * n_classes).ravel()
+        weights = np.broadcast_to(self._rank_weights(k), (n, k)).ravel() if self.weighted else None
+        votes = np.bincount(offsets, weights=weights, minlength=n*n_classes).reshape(n, n_classes)
+        # the most voted class wins (ties: the smallest class)
+        return self._classes[np.argmax(votes, axis=1)]
+
+    def _predict_tree(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the predicted labels of the samples in X, querying the k-d tree built in 'fit' for
+        the closest neighbors of each sample (neighbors are returned ordered by distance).
+
+        Parameters
+        ----------
+        X: np.ndarray
+            The samples to be assigned to a label
+        """
+        k = min(self.k, self._X.shape[0])
+        p = 2 if self._is_euclidean else 1
+        _, k_nearest_neighbors = self._tree.query(X, k=k, p=p, workers=-1)
+        return self._vote(k_nearest_neighbors.reshape(X.shape[0], k))
+
+    def _predict_vectorized(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the predicted labels of the samples in X. For large training sets, the k-d tree built
+        in 'fit' is queried. Otherwise, if numba is available, uses a compiled kernel (see
+        _knn_predict_numba) for the manhattan distance and for euclidean distances in at most
+        _NUMBA_MAX_FEATURES dimensions. Otherwise, samples are processed in blocks of <self.block_size>
+        rows (euclidean distances are computed with a matrix product), so that the intermediate
+        distance matrices fit in cache.
+
+        Parameters
+        ----------
+        X: np.ndarray
+            The samples to be assigned to a label
+        """
+        X = np.ascontiguousarray(X, dtype=self._X.dtype)
+        if self._tree is not None:
+            return self._predict_tree(X)
+        # compiled kernel (no distance matrix)
+        if NUMBA_AVAILABLE and (not self._is_euclidean or X.shape[1] <= _NUMBA_MAX_FEATURES):
+            k = min(self.k, self._X.shape[0])
+            weights = self._rank_weights(k) if self.weighted else np.ones(k)
+            y_pred = _knn_predict_numba(X, self._X, self._y_idx, self._classes.size, k, weights,
+                                        not self._is_euclidean)
+            return self._classes[y_pred]
+        blocks = [self._predict_block(X[start:start+self.block_size])
+                  for start in range(0, X.shape[0], self.block_size)]
+        return np.concatenate(blocks)
 
     def predict(self, dataset: Dataset) -> np.ndarray:
         """
@@ -102,6 +368,9 @@ class KNNClassifier:
         """
         if not self.fitted:
             raise Warning("Fit 'KNNClassifier' before calling 'predict'.")
+        # euclidean and manhattan distances are computed for all samples at once
+        if self.distance is euclidean_distance or self.distance is manhattan_distance:
+            return self._predict_vectorized(dataset.X)
         return np.apply_along_axis(self._get_closest_label, axis=1, arr=dataset.X)
 
     def score(self, dataset: Dataset) -> float:
@@ -125,7 +394,6 @@ if __name__ == "__main__":
     TEST_PATHS = ["../io", "../model_selection"]
     sys.path.extend(TEST_PATHS)
     from csv_file import read_csv_file
-    from distances import manhattan_distance
     from split import train_test_split
 
     print("EX1")